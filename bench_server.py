@@ -0,0 +1,73 @@
+import os
+import time
+import argparse
+import tempfile
+import threading
+from functools import partial
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from server import SendfileHTTPRequestHandler
+
+
+class QuietSimpleHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class QuietSendfileHandler(SendfileHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def start_server(handler_class, directory):
+    handler = partial(handler_class, directory=directory)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    return httpd
+
+
+def fetch(port, path, rounds):
+    conn = HTTPConnection("127.0.0.1", port)
+    total = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        conn.request("GET", path)
+        response = conn.getresponse()
+        while chunk := response.read(1 << 20):
+            total += len(chunk)
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return total, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare large file throughput of the HTTP handlers")
+    parser.add_argument("--size", type=int, default=256,
+                        help="Size of the test file in MiB")
+    parser.add_argument("--rounds", type=int, default=10,
+                        help="Number of downloads per handler")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "large.bin"), "wb") as f:
+            for _ in range(args.size):
+                f.write(os.urandom(1 << 20))
+
+        # Quiet subclasses keep request logging out of the measurement.
+        for handler_class in (QuietSimpleHandler, QuietSendfileHandler):
+            httpd = start_server(handler_class, directory)
+            fetch(httpd.server_port, "/large.bin", 1)
+            total, elapsed = fetch(
+                httpd.server_port, "/large.bin", args.rounds)
+            httpd.shutdown()
+            httpd.server_close()
+            print(f"{handler_class.__name__}: "
+                  f"{total / elapsed / (1 << 20):.1f} MiB/s "
+                  f"({args.rounds} x {args.size} MiB in {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
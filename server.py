@@ -1,11 +1,146 @@
 import os
+import re
 import argparse
+import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 
 
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: (str | None), size: int) -> (tuple[int, int] | None):
+    """Return the inclusive (start, end) byte span asked for by a Range
+    header, or None if the whole file should be sent instead.
+
+    Only single ranges are supported; anything else is ignored as allowed by
+    RFC 9110. Raises ValueError if the range can't be satisfied."""
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+class SendfileHTTPRequestHandler(SimpleHTTPRequestHandler):
+    """Serves regular files with sendfile(2) and single Range requests.
+
+    Directories, listings and errors are left to SimpleHTTPRequestHandler."""
+
+    def do_GET(self):
+        if not self.serve_file(send_body=True):
+            super().do_GET()
+
+    def do_HEAD(self):
+        if not self.serve_file(send_body=False):
+            super().do_HEAD()
+
+    def not_modified(self, stat: os.stat_result) -> bool:
+        """Mirror SimpleHTTPRequestHandler.send_head: If-Modified-Since is
+        only honoured when there is no If-None-Match."""
+        if "If-Modified-Since" not in self.headers or \
+                "If-None-Match" in self.headers:
+            return False
+        try:
+            ims = parsedate_to_datetime(self.headers["If-Modified-Since"])
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        if ims.tzinfo is None:
+            ims = ims.replace(tzinfo=datetime.timezone.utc)
+        if ims.tzinfo is not datetime.timezone.utc:
+            return False
+        last_modified = datetime.datetime.fromtimestamp(
+            stat.st_mtime, datetime.timezone.utc).replace(microsecond=0)
+        return last_modified <= ims
+
+    def range_header(self, last_modified: str) -> (str | None):
+        """Return the Range header unless an If-Range validator says the
+        file changed. Only an exact Last-Modified date matches; entity tags
+        never do since no ETag is sent."""
+        if_range = self.headers.get("If-Range")
+        if if_range is not None and if_range.strip() != last_modified:
+            return None
+        return self.headers.get("Range")
+
+    def serve_file(self, send_body: bool) -> bool:
+        path = self.translate_path(self.path)
+        if self.path.split("?", 1)[0].endswith("/") or \
+                not os.path.isfile(path):
+            return False
+
+        # Open before committing to a status, like send_head, so a file that
+        # vanished or can't be read gets a 404 instead of a truncated 200.
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return True
+
+        with f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+            if self.not_modified(stat):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("Last-Modified", last_modified)
+                self.end_headers()
+                return True
+
+            try:
+                span = parse_range(self.range_header(last_modified), size)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return True
+
+            if span:
+                start, end = span
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header("Content-Range",
+                                 f"bytes {start}-{end}/{size}")
+            else:
+                start, end = 0, size - 1
+                self.send_response(HTTPStatus.OK)
+            length = end - start + 1
+
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+
+            if send_body and length > 0:
+                self.wfile.flush()
+                # socket.sendfile() uses os.sendfile where the platform has
+                # it and falls back to plain send() otherwise.
+                self.connection.sendfile(f, offset=start, count=length)
+        return True
+
+
 def run(
     server_class=HTTPServer,
-    handler_class=SimpleHTTPRequestHandler,
+    handler_class=SendfileHTTPRequestHandler,
     port=8888,
     directory="./static",
 ):
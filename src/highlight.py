@@ -0,0 +1,226 @@
+import os
+import re
+import hashlib
+import tempfile
+from html import escape
+
+# Bump whenever the lexers change so stale cache entries are not reused.
+LEXER_VERSION = "1"
+
+NUMBER = r"\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+SINGLE_QUOTED = r"'(?:\\.|[^'\\\n])*'"
+C_COMMENT = r"//[^\n]*|/\*[\s\S]*?\*/"
+HASH_COMMENT = r"#[^\n]*"
+
+
+def words(*keywords: str) -> str:
+    return r"\b(?:" + "|".join(keywords) + r")\b"
+
+
+def c_like(keywords: list[str], literals: list[str]) -> list[tuple]:
+    return [
+        ("com", C_COMMENT),
+        ("str", f"{DOUBLE_QUOTED}|{SINGLE_QUOTED}|`[^`]*`"),
+        ("kw", words(*keywords)),
+        ("lit", words(*literals)),
+        ("num", NUMBER),
+    ]
+
+
+LEXER_RULES = {
+    "python": [
+        ("com", HASH_COMMENT),
+        ("str", r'[rbfuRBFU]{0,2}(?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|'
+                f"{DOUBLE_QUOTED}|{SINGLE_QUOTED})"),
+        ("kw", words(
+            "and", "as", "assert", "async", "await", "break", "class",
+            "continue", "def", "del", "elif", "else", "except", "finally",
+            "for", "from", "global", "if", "import", "in", "is", "lambda",
+            "match", "case", "nonlocal", "not", "or", "pass", "raise",
+            "return", "try", "while", "with", "yield")),
+        ("lit", words("True", "False", "None", "self")),
+        ("num", NUMBER),
+    ],
+    "javascript": c_like(
+        ["async", "await", "break", "case", "catch", "class", "const",
+         "continue", "default", "delete", "do", "else", "export", "extends",
+         "finally", "for", "from", "function", "if", "import", "in",
+         "instanceof", "interface", "let", "new", "of", "return", "static",
+         "switch", "throw", "try", "type", "typeof", "var", "void", "while",
+         "yield"],
+        ["true", "false", "null", "undefined", "this", "NaN"]),
+    "c": c_like(
+        ["auto", "break", "case", "char", "class", "const", "continue",
+         "default", "delete", "do", "double", "else", "enum", "extern",
+         "float", "for", "goto", "if", "include", "inline", "int", "long",
+         "namespace", "new", "private", "protected", "public", "return",
+         "short", "signed", "sizeof", "static", "struct", "switch",
+         "template", "typedef", "union", "unsigned", "using", "void",
+         "volatile", "while"],
+        ["true", "false", "NULL", "nullptr", "this"]),
+    "java": c_like(
+        ["abstract", "boolean", "break", "byte", "case", "catch", "char",
+         "class", "continue", "default", "do", "double", "else", "enum",
+         "extends", "final", "finally", "float", "for", "if", "implements",
+         "import", "instanceof", "int", "interface", "long", "new",
+         "package", "private", "protected", "public", "return", "short",
+         "static", "super", "switch", "synchronized", "throw", "throws",
+         "try", "var", "void", "while"],
+        ["true", "false", "null", "this"]),
+    "go": c_like(
+        ["break", "case", "chan", "const", "continue", "default", "defer",
+         "else", "fallthrough", "for", "func", "go", "goto", "if", "import",
+         "interface", "map", "package", "range", "return", "select",
+         "struct", "switch", "type", "var"],
+        ["true", "false", "nil", "iota"]),
+    "rust": c_like(
+        ["as", "async", "await", "break", "const", "continue", "crate",
+         "dyn", "else", "enum", "extern", "fn", "for", "if", "impl", "in",
+         "let", "loop", "match", "mod", "move", "mut", "pub", "ref",
+         "return", "static", "struct", "trait", "type", "unsafe", "use",
+         "where", "while"],
+        ["true", "false", "self", "Self", "None", "Some", "Ok", "Err"]),
+    "bash": [
+        ("com", r"(?<![\w$])#[^\n]*"),
+        ("str", f"{DOUBLE_QUOTED}|{SINGLE_QUOTED}"),
+        ("var", r"\$(?:\{[^}\n]*\}|\w+|[#?@*$!])"),
+        ("kw", words(
+            "if", "then", "elif", "else", "fi", "for", "while", "until",
+            "do", "done", "case", "esac", "in", "function", "return",
+            "export", "local", "set", "end")),
+        ("num", NUMBER),
+    ],
+    "json": [
+        ("attr", DOUBLE_QUOTED + r"(?=\s*:)"),
+        ("str", DOUBLE_QUOTED),
+        ("lit", words("true", "false", "null")),
+        ("num", r"-?" + NUMBER),
+    ],
+    "css": [
+        ("com", r"/\*[\s\S]*?\*/"),
+        ("str", f"{DOUBLE_QUOTED}|{SINGLE_QUOTED}"),
+        ("attr", r"[\w-]+(?=\s*:[^;{}]*[;}])"),
+        ("num", r"#[0-9a-fA-F]{3,8}\b|"
+                r"(?<![\w-])-?\d*\.?\d+(?:%|[a-zA-Z]+)?"),
+    ],
+}
+
+ALIASES = {
+    "py": "python",
+    "js": "javascript",
+    "jsx": "javascript",
+    "ts": "javascript",
+    "tsx": "javascript",
+    "typescript": "javascript",
+    "h": "c",
+    "cpp": "c",
+    "c++": "c",
+    "cc": "c",
+    "golang": "go",
+    "rs": "rust",
+    "sh": "bash",
+    "shell": "bash",
+    "zsh": "bash",
+    "fish": "bash",
+    "console": "bash",
+}
+
+LEXERS = {
+    language: re.compile("|".join(f"(?P<{kind}>{pattern})"
+                                  for kind, pattern in rules))
+    for language, rules in LEXER_RULES.items()
+}
+
+
+def resolve(language: str) -> str:
+    language = language.lower()
+    return ALIASES.get(language, language)
+
+
+def lexer_for(language: str) -> (re.Pattern | None):
+    return LEXERS.get(resolve(language))
+
+
+def tokenize(code: str, lexer: re.Pattern) -> str:
+    html = ""
+    position = 0
+    for match in lexer.finditer(code):
+        html += escape(code[position:match.start()], quote=False)
+        html += f'<span class="hl-{match.lastgroup}">'
+        html += escape(match.group(), quote=False) + "</span>"
+        position = match.end()
+    html += escape(code[position:], quote=False)
+    return html
+
+
+class HighlightCache:
+    def __init__(self, directory: (str | None) = None) -> None:
+        self.directory = directory
+        self.entries: dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.plain = 0
+
+    def __repr__(self) -> str:
+        return f"HighlightCache(directory({self.directory}), \
+hits({self.hits}), \
+misses({self.misses}), \
+plain({self.plain}))"
+
+    @staticmethod
+    def key(code: str, language: str) -> str:
+        data = "\0".join((LEXER_VERSION, resolve(language), code))
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def highlight(self, code: str, language: str) -> str:
+        lexer = lexer_for(language)
+        if lexer is None:
+            self.plain += 1
+            return escape(code, quote=False)
+
+        key = self.key(code, language)
+        if key in self.entries:
+            self.hits += 1
+            return self.entries[key]
+
+        path = None
+        if self.directory:
+            path = os.path.join(self.directory, f"{key}.html")
+            if os.path.isfile(path):
+                self.hits += 1
+                with open(path, encoding="utf-8") as f:
+                    self.entries[key] = f.read()
+                return self.entries[key]
+
+        self.misses += 1
+        html = tokenize(code, lexer)
+        self.entries[key] = html
+        if path:
+            # Write through a temporary file so an interrupted build can't
+            # leave a truncated entry behind.
+            os.makedirs(self.directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                    "w", encoding="utf-8", dir=self.directory, suffix=".tmp",
+                    delete=False) as f:
+                try:
+                    f.write(html)
+                except BaseException:
+                    f.close()
+                    os.remove(f.name)
+                    raise
+            os.replace(f.name, path)
+        return html
+
+    def hit_rate(self) -> (float | None):
+        total = self.hits + self.misses
+        if not total:
+            return None
+        return self.hits / total
+
+
+cache = HighlightCache()
+
+
+def highlight(code: str, language: str) -> str:
+    return cache.highlight(code, language)
@@ -1,4 +1,5 @@
 from typing import Dict
+from highlight import highlight
 
 
 class HTMLNode:
@@ -103,8 +104,13 @@ props({self.props}))"
             node.tag = f"h{block.header_level()}"
             block.value = block.value.lstrip("#").lstrip()
         elif block.type == BlockType.code:
+            language, code = block.code_fence()
             node.tag = "pre"
-            node.children.append(LeafNode(tag="code", value=block.value))
+            node.children.append(LeafNode(
+                tag="code",
+                value=highlight(code, language),
+                props={"class": f"language-{language}"} if language else None
+            ))
             return node
         elif block.type == BlockType.quote:
             node.tag = "blockquote"
@@ -1,9 +1,127 @@
 import os
+import json
 import shutil
+import hashlib
+import argparse
+import tempfile
+import highlight
 from htmlnode import ParentNode
 
 
-def copy_recursive(path, target):
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def relative(path, root) -> str:
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def write_if_changed(target, digest: str, source: (str | bytes)) -> bool:
+    """Write source (a file to copy or the bytes of a page) to target unless
+    target already hashes to digest, so unchanged outputs keep their mtime.
+    Returns True if the file was written.
+    """
+    if os.path.isfile(target) and hash_file(target) == digest:
+        return False
+    if isinstance(source, bytes):
+        with open(target, "wb") as f:
+            f.write(source)
+    else:
+        shutil.copy(source, target)
+    return True
+
+
+def hash_tree(path) -> dict[str, str]:
+    hashes = {}
+    if not os.path.exists(path):
+        return hashes
+    for root, _, files in os.walk(path):
+        for file in files:
+            filepath = os.path.join(root, file)
+            hashes[relative(filepath, path)] = hash_file(filepath)
+    return hashes
+
+
+def diff_hashes(base: dict[str, str], current: dict[str, str]) -> dict:
+    return {
+        "added": sorted(p for p in current if p not in base),
+        "modified": sorted(p for p in current
+                           if p in base and base[p] != current[p]),
+        "removed": sorted(p for p in base if p not in current),
+        "files": dict(sorted(current.items())),
+    }
+
+
+def load_manifest(path) -> (dict[str, str] | None):
+    """Return the file hashes recorded in the manifest at path, or None if
+    it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            files = json.load(f)["files"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(files, dict):
+        return None
+    return files
+
+
+def write_manifest(path, manifest: dict):
+    # Write through a temporary file so a crashed build can't leave a
+    # truncated manifest behind.
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False) as f:
+        try:
+            json.dump(manifest, f, indent=2)
+            f.write("\n")
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+def emit(target, source: (str | bytes), outputs=None):
+    """Stage source (a file path or page bytes) for target in outputs, or
+    write it straight away if no outputs dict is given. Later entries
+    replace earlier ones."""
+    if isinstance(source, bytes):
+        digest = hash_bytes(source)
+    else:
+        digest = hash_file(source)
+    if outputs is None:
+        write_if_changed(target, digest, source)
+    else:
+        outputs[target] = (digest, source)
+
+
+def write_outputs(outputs: dict, root) -> dict[str, str]:
+    """Write every staged output under root and return their hashes, keyed
+    by path relative to root."""
+    current = {}
+    for target, (digest, source) in outputs.items():
+        write_if_changed(target, digest, source)
+        current[relative(target, root)] = digest
+    return current
+
+
+def remove_stale(path, outputs):
+    for root, _, files in os.walk(path, topdown=False):
+        for file in files:
+            filepath = os.path.join(root, file)
+            if filepath not in outputs:
+                print(f"removing stale {filepath}")
+                os.remove(filepath)
+        if root != path and not os.listdir(root):
+            os.rmdir(root)
+
+
+def copy_recursive(path, target, outputs=None):
     if not os.path.exists(target):
         print(f"creating target {target} directory")
         os.mkdir(target)
@@ -16,12 +134,12 @@ def copy_recursive(path, target):
         filetarget = os.path.join(target, file)
 
         if os.path.isfile(filepath):
-            shutil.copy(filepath, filetarget)
+            emit(filetarget, filepath, outputs)
         else:
-            copy_recursive(filepath, filetarget)
+            copy_recursive(filepath, filetarget, outputs)
 
 
-def generate_page(from_path, template_path, target_path):
+def generate_page(from_path, template_path, target_path, outputs=None):
     md_file = open(from_path)
 
     md_file = md_file.read()
@@ -33,11 +151,10 @@ def generate_page(from_path, template_path, target_path):
     template_result = template_result.replace(
         "{{ Content }}", html_content.to_html())
 
-    target_file = open(target_path, "w+")
-    target_file.write(template_result)
+    emit(target_path, template_result.encode(), outputs)
 
 
-def generate_recursive(from_path, template_path, target_path):
+def generate_recursive(from_path, template_path, target_path, outputs=None):
     if not os.path.exists(target_path):
         print(f"creating target {target_path} directory")
         os.mkdir(target_path)
@@ -53,22 +170,73 @@ def generate_recursive(from_path, template_path, target_path):
             if filetarget.endswith(".md"):
                 filetarget = filetarget.rstrip(".md") + ".html"
             print(f"Generating {filepath} at {filetarget}")
-            generate_page(filepath, template_path, filetarget)
+            generate_page(filepath, template_path, filetarget, outputs)
         else:
-            generate_recursive(filepath, template_path, filetarget)
+            generate_recursive(filepath, template_path, filetarget, outputs)
+
 
+def record_deployed(manifest_path, deployed_path):
+    if load_manifest(manifest_path) is None:
+        raise Exception(f"{manifest_path} is missing or invalid")
+    with open(manifest_path) as f:
+        write_manifest(deployed_path, json.load(f))
+    print(f"Recorded {manifest_path} as deployed in {deployed_path}")
 
-def main():
+
+def main(since_deploy=False, mark_deployed=False):
     static_path = "./static"
     content_path = "./content"
     template_path = "template.html"
     target_path = "./public"
-
-    shutil.rmtree(target_path)
-    copy_recursive(static_path, target_path)
-
-    generate_recursive(content_path, template_path, target_path)
+    manifest_path = "./deploy_manifest.json"
+    deployed_path = "./deployed_manifest.json"
+
+    if mark_deployed:
+        record_deployed(manifest_path, deployed_path)
+        return
+
+    highlight.cache = highlight.HighlightCache("./.cache/highlight")
+
+    # The delta is taken against the previous build, or with since_deploy
+    # against the build last recorded by --mark-deployed.
+    base = None
+    if since_deploy:
+        base = load_manifest(deployed_path)
+    if base is None:
+        base = load_manifest(manifest_path)
+    if base is None:
+        base = hash_tree(target_path)
+
+    outputs = {}
+    copy_recursive(static_path, target_path, outputs)
+    generate_recursive(content_path, template_path, target_path, outputs)
+    current = write_outputs(outputs, target_path)
+    remove_stale(target_path, outputs)
+
+    manifest = diff_hashes(base, current)
+    write_manifest(manifest_path, manifest)
+    print(f"Wrote {manifest_path}: {len(manifest['added'])} added, "
+          f"{len(manifest['modified'])} modified, "
+          f"{len(manifest['removed'])} removed")
+    hit_rate = highlight.cache.hit_rate()
+    print(f"Highlight cache: {highlight.cache.hits} hits, "
+          f"{highlight.cache.misses} misses "
+          f"({'n/a' if hit_rate is None else f'{hit_rate:.0%}'} hit rate), "
+          f"{highlight.cache.plain} plain blocks")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Static site generator")
+    parser.add_argument(
+        "--since-deploy",
+        action="store_true",
+        help="Diff against the last build recorded with --mark-deployed"
+    )
+    parser.add_argument(
+        "--mark-deployed",
+        action="store_true",
+        help="Record the current manifest as deployed instead of building"
+    )
+    args = parser.parse_args()
+
+    main(since_deploy=args.since_deploy, mark_deployed=args.mark_deployed)
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from highlight import HighlightCache, lexer_for, tokenize
+
+
+class TestHighlight(unittest.TestCase):
+    def test_tokenize(self):
+        html = tokenize('return "a<b" # done', lexer_for("py"))
+        self.assertEqual(
+            html,
+            '<span class="hl-kw">return</span> '
+            '<span class="hl-str">"a&lt;b"</span> '
+            '<span class="hl-com"># done</span>'
+        )
+
+    def test_unknown_language(self):
+        cache = HighlightCache()
+        self.assertEqual(cache.highlight("<p>", "brainfuck"), "&lt;p&gt;")
+        self.assertEqual(cache.highlight("x", ""), "x")
+        self.assertEqual((cache.hits, cache.misses, cache.plain), (0, 0, 2))
+        self.assertIsNone(cache.hit_rate())
+
+
+class TestHighlightCache(unittest.TestCase):
+    def test_memory_hits(self):
+        cache = HighlightCache()
+        first = cache.highlight("let x = 1;", "js")
+        self.assertEqual(cache.highlight("let x = 1;", "js"), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate(), 0.5)
+
+    def test_disk_hits(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = HighlightCache(directory)
+            html = first.highlight("fn main() {}", "rust")
+            self.assertEqual(len(os.listdir(directory)), 1)
+            self.assertTrue(os.listdir(directory)[0].endswith(".html"))
+
+            second = HighlightCache(directory)
+            self.assertEqual(second.highlight("fn main() {}", "rust"), html)
+            self.assertEqual((second.hits, second.misses), (1, 0))
+
+    def test_key(self):
+        self.assertNotEqual(HighlightCache.key("x", "py"),
+                            HighlightCache.key("x", "js"))
+        self.assertEqual(HighlightCache.key("x", "py"),
+                         HighlightCache.key("x", "Python"))
+
+    def test_aliases_share_entries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = HighlightCache(directory)
+            cache.highlight("x = 1", "py")
+            cache.highlight("x = 1", "python")
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_non_ascii(self):
+        with tempfile.TemporaryDirectory() as directory:
+            html = HighlightCache(directory).highlight('s = "Eä"', "py")
+            self.assertEqual(
+                HighlightCache(directory).highlight('s = "Eä"', "py"), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -68,6 +68,26 @@ This is the same paragraph on a new line</p><ul><li>This is a list</li><li>with
 
         self.assertEqual(test, expect)
 
+    def test_from_markdown_code(self):
+        test = ParentNode.from_markdown("""```python
+            x = None
+            ```
+
+            ```
+            <b>
+            ```""").to_html()
+
+        expect = """<div><pre><code class="language-python">x = \
+<span class="hl-lit">None</span></code></pre><pre><code>&lt;b&gt;</code></pre></div>"""
+
+        self.assertEqual(test, expect)
+
+    def test_from_markdown_code_tag_escaped(self):
+        test = ParentNode.from_markdown('```"><script>\nx\n```').to_html()
+        self.assertEqual(
+            test,
+            '<div><pre><code>"&gt;&lt;script&gt;\nx\n</code></pre></div>')
+
 
 if __name__ == "__main__":
     unittest.main()
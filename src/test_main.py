@@ -0,0 +1,163 @@
+import os
+import json
+import stat
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from main import (diff_hashes, emit, hash_bytes, hash_tree, load_manifest,
+                  main, remove_stale, write_if_changed, write_manifest,
+                  write_outputs)
+
+
+class TestDeltaManifest(unittest.TestCase):
+    def test_write_if_changed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            target = os.path.join(directory, "index.html")
+            one, two = b"<p>one</p>", b"<p>two</p>"
+            self.assertTrue(write_if_changed(target, hash_bytes(one), one))
+            self.assertFalse(write_if_changed(target, hash_bytes(one), one))
+            self.assertTrue(write_if_changed(target, hash_bytes(two), two))
+            with open(target, "rb") as f:
+                self.assertEqual(f.read(), two)
+
+    def test_write_if_changed_copy(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "run.sh")
+            target = os.path.join(directory, "copy.sh")
+            emit(source, b"echo hi")
+            os.chmod(source, 0o755)
+
+            digest = hash_bytes(b"echo hi")
+            self.assertTrue(write_if_changed(target, digest, source))
+            self.assertEqual(stat.S_IMODE(os.stat(target).st_mode), 0o755)
+            self.assertFalse(write_if_changed(target, digest, source))
+
+    def test_write_outputs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            target = os.path.join(directory, "index.html")
+            emit(target, b"old")
+            outputs = {}
+            emit(target, b"new", outputs)
+
+            current = write_outputs(outputs, directory)
+            self.assertEqual(current, {"index.html": hash_bytes(b"new")})
+            with open(target, "rb") as f:
+                self.assertEqual(f.read(), b"new")
+
+    def test_hash_tree(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, "images"))
+            emit(os.path.join(directory, "index.html"), b"a")
+            emit(os.path.join(directory, "images", "x.png"), b"a")
+            hashes = hash_tree(directory)
+            self.assertEqual(sorted(hashes), ["images/x.png", "index.html"])
+            self.assertEqual(hashes["images/x.png"], hashes["index.html"])
+
+    def test_diff_hashes(self):
+        base = {"index.html": "1", "index.css": "2", "old.html": "3"}
+        current = {"index.html": "1", "index.css": "4", "new.html": "5"}
+        self.assertEqual(diff_hashes(base, current), {
+            "added": ["new.html"],
+            "modified": ["index.css"],
+            "removed": ["old.html"],
+            "files": {"index.css": "4", "index.html": "1", "new.html": "5"},
+        })
+
+    def test_load_manifest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "deploy_manifest.json")
+            self.assertIsNone(load_manifest(path))
+
+            write_manifest(path, {"files": {"index.html": "1"}})
+            self.assertEqual(load_manifest(path), {"index.html": "1"})
+            self.assertEqual(os.listdir(directory), ["deploy_manifest.json"])
+
+            for broken in ('{"files": {"index.h', '{"added": []}', "[]"):
+                with open(path, "w") as f:
+                    f.write(broken)
+                self.assertIsNone(load_manifest(path))
+
+    def test_remove_stale(self):
+        with tempfile.TemporaryDirectory() as directory:
+            keep = os.path.join(directory, "index.html")
+            stale = os.path.join(directory, "old", "index.html")
+            os.mkdir(os.path.join(directory, "old"))
+            emit(keep, b"keep")
+            emit(stale, b"stale")
+            remove_stale(directory, {keep: (hash_bytes(b"keep"), b"keep")})
+            self.assertTrue(os.path.exists(keep))
+            self.assertFalse(os.path.exists(os.path.dirname(stale)))
+
+
+class TestBuild(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+
+        os.mkdir("static")
+        os.mkdir("content")
+        self.write("static/index.css", "body {}")
+        self.write("content/index.md", "# Home")
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, **kwargs) -> dict:
+        with redirect_stdout(StringIO()):
+            main(**kwargs)
+        with open("deploy_manifest.json") as f:
+            return json.load(f)
+
+    def test_delta_against_previous_build(self):
+        manifest = self.build()
+        self.assertEqual(manifest["added"], ["index.css", "index.html"])
+
+        mtime = os.stat("public/index.html").st_mtime_ns
+        manifest = self.build()
+        self.assertEqual(
+            (manifest["added"], manifest["modified"], manifest["removed"]),
+            ([], [], []))
+        self.assertEqual(os.stat("public/index.html").st_mtime_ns, mtime)
+
+        self.write("static/index.css", "body { margin: 0; }")
+        self.assertEqual(self.build()["modified"], ["index.css"])
+        self.assertEqual(self.build()["modified"], [])
+
+    def test_repairs_hand_edited_output(self):
+        self.build()
+        self.write("public/index.css", "hand edit")
+        self.build()
+        with open("public/index.css") as f:
+            self.assertEqual(f.read(), "body {}")
+
+    def test_broken_manifest(self):
+        self.build()
+        self.write("deploy_manifest.json", '{"files": ')
+        manifest = self.build()
+        self.assertEqual(manifest["added"], [])
+        self.assertEqual(load_manifest("deploy_manifest.json"),
+                         manifest["files"])
+
+    def test_since_deploy(self):
+        self.build()
+        with redirect_stdout(StringIO()):
+            main(mark_deployed=True)
+
+        self.write("static/index.css", "body { margin: 0; }")
+        self.build()
+        self.write("content/about.md", "# About")
+        self.assertEqual(self.build()["modified"], [])
+
+        manifest = self.build(since_deploy=True)
+        self.assertEqual(manifest["added"], ["about.html"])
+        self.assertEqual(manifest["modified"], ["index.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -143,5 +143,20 @@ class TestBlockType(unittest.TestCase):
         self.assertListEqual(test, expect)
 
 
+class TestBlock(unittest.TestCase):
+    def test_code_fence(self):
+        block = Block("```python\nprint(1)\nprint(2)\n```")
+        self.assertEqual(block.code_fence(), ("python", "print(1)\nprint(2)"))
+        self.assertEqual(Block("```x = 1```").code_fence(), ("", "x = 1"))
+        self.assertEqual(Block("```print(1)\nprint(2)```").code_fence(),
+                         ("", "print(1)\nprint(2)"))
+        self.assertEqual(Block("```py title=x\nx = 1\n```").code_fence(),
+                         ("py", "x = 1"))
+        self.assertEqual(Block('```"><script>\nx\n```').code_fence(),
+                         ("", '"><script>\nx\n'))
+        with self.assertRaises(ValueError):
+            Block("# Heading").code_fence()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,9 @@ from enum import Enum
 import re
 from htmlnode import LeafNode
 
+CODE_FENCE_RE = re.compile(
+    r"^```([\w+#.-]*)(?:[ \t][^\n]*)?\n(?:([\s\S]*)\n)?```$")
+
 
 class TextNode:
     def __init__(
@@ -168,6 +171,17 @@ class Block:
         level -= len(self.value.lstrip("#").lstrip())+1
         return level
 
+    def code_fence(self) -> tuple[str, str]:
+        if not self.type == BlockType.code:
+            raise ValueError("Not a code type block")
+
+        # Only a fence line of its own carries a language tag; extra words
+        # after the tag ("py title=x") are ignored.
+        fence = CODE_FENCE_RE.match(self.value)
+        if not fence:
+            return "", self.value[3:-3]
+        return fence.group(1), fence.group(2) or ""
+
 
 class BlockList:
     def __init__(self, text: str):
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import threading
+import unittest
+from functools import partial
+from email.utils import formatdate
+from http.client import HTTPConnection
+from http.server import HTTPServer
+
+from server import SendfileHTTPRequestHandler, parse_range
+
+
+class QuietHandler(SendfileHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class TestParseRange(unittest.TestCase):
+    def test_range(self):
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-5000", 1000), (900, 999))
+
+    def test_suffix_range(self):
+        self.assertEqual(parse_range("bytes=-10", 1000), (990, 999))
+        self.assertEqual(parse_range("bytes=-5000", 1000), (0, 999))
+
+    def test_open_ended_range(self):
+        self.assertEqual(parse_range("bytes=100-", 1000), (100, 999))
+
+    def test_ignored_ranges(self):
+        self.assertIsNone(parse_range(None, 1000))
+        self.assertIsNone(parse_range("bytes=99-0", 1000))
+        self.assertIsNone(parse_range("bytes=0-9,20-29", 1000))
+        self.assertIsNone(parse_range("bytes=-", 1000))
+        self.assertIsNone(parse_range("items=0-9", 1000))
+
+    def test_unsatisfiable_ranges(self):
+        with self.assertRaises(ValueError):
+            parse_range("bytes=1000-", 1000)
+        with self.assertRaises(ValueError):
+            parse_range("bytes=-0", 1000)
+
+    def test_empty_file(self):
+        with self.assertRaises(ValueError):
+            parse_range("bytes=0-", 0)
+        with self.assertRaises(ValueError):
+            parse_range("bytes=-10", 0)
+
+
+class TestSendfileHTTPRequestHandler(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.body = bytes(range(256)) * 4
+        self.path = os.path.join(self.directory.name, "data.bin")
+        with open(self.path, "wb") as f:
+            f.write(self.body)
+
+        handler = partial(QuietHandler, directory=self.directory.name)
+        self.httpd = HTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=self.httpd.serve_forever,
+                                  daemon=True)
+        thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.directory.cleanup()
+
+    def request(self, method, headers=None):
+        conn = HTTPConnection("127.0.0.1", self.httpd.server_port)
+        conn.request(method, "/data.bin", headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    def test_get(self):
+        response, body = self.request("GET")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Accept-Ranges"), "bytes")
+        self.assertEqual(body, self.body)
+
+    def test_partial_content(self):
+        response, body = self.request("GET", {"Range": "bytes=10-19"})
+        self.assertEqual(response.status, 206)
+        self.assertEqual(response.getheader("Content-Range"),
+                         "bytes 10-19/1024")
+        self.assertEqual(body, self.body[10:20])
+
+    def test_if_range(self):
+        last_modified = formatdate(os.stat(self.path).st_mtime, usegmt=True)
+        response, body = self.request(
+            "GET", {"Range": "bytes=0-9", "If-Range": last_modified})
+        self.assertEqual(response.status, 206)
+        self.assertEqual(body, self.body[:10])
+
+        for validator in ("Mon, 01 Jan 1990 00:00:00 GMT", '"etag"'):
+            response, body = self.request(
+                "GET", {"Range": "bytes=0-9", "If-Range": validator})
+            self.assertEqual(response.status, 200)
+            self.assertIsNone(response.getheader("Content-Range"))
+            self.assertEqual(body, self.body)
+
+    def test_range_not_satisfiable(self):
+        response, body = self.request("GET", {"Range": "bytes=2000-"})
+        self.assertEqual(response.status, 416)
+        self.assertEqual(response.getheader("Content-Range"), "bytes */1024")
+        self.assertEqual(body, b"")
+
+    def test_head(self):
+        response, body = self.request("HEAD")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Length"), "1024")
+        self.assertEqual(body, b"")
+
+    def test_not_modified(self):
+        mtime = os.stat(self.path).st_mtime
+        response, body = self.request(
+            "GET", {"If-Modified-Since": formatdate(mtime, usegmt=True)})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+
+        response, body = self.request(
+            "GET", {"If-Modified-Since": formatdate(mtime - 60, usegmt=True)})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, self.body)
+
+
+if __name__ == "__main__":
+    unittest.main()